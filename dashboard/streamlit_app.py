@@ -4,10 +4,10 @@ dashboard/streamlit_app.py
 Payments Risk Controls Monitoring Dashboard (synthetic/mock data).
 
 Reads outputs from:
-- data/combined_transactions.csv
-- data/control_decisions.csv
-- data/control_hits.csv
-- data/control_metrics.csv
+- data/combined_transactions.parquet
+- data/control_decisions.parquet
+- data/control_hits.parquet
+- data/control_metrics.parquet
 
 Goal:
 A clean internal-tool style UI to monitor:
@@ -19,12 +19,13 @@ A clean internal-tool style UI to monitor:
 
 from __future__ import annotations
 
+import math
 import os
 from typing import Tuple, List
 
+import numpy as np
 import pandas as pd
 import streamlit as st
-import matplotlib.pyplot as plt
 
 
 # -----------------------------
@@ -37,21 +38,36 @@ st.set_page_config(
 )
 
 
+# Drill-down table sizing
+DRILLDOWN_MAX_ROWS = 250
+DRILLDOWN_PAGE_SIZE = 50
+
+
 # -----------------------------
 # Data loading
 # -----------------------------
+REQUIRED_FILES = [
+    "data/combined_transactions.parquet",
+    "data/control_decisions.parquet",
+    "data/control_hits.parquet",
+    "data/control_metrics.parquet",
+]
+
+
+def data_mtimes() -> Tuple[float, ...]:
+    """
+    Modification times of the input files, used as the cache key for loaders.
+    Re-running the pipeline changes the key, so cached results refresh.
+    """
+    return tuple(os.path.getmtime(p) if os.path.exists(p) else 0.0 for p in REQUIRED_FILES)
+
+
 @st.cache_data
-def load_data() -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+def load_data(mtimes: Tuple[float, ...]) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     """
-    Load required CSVs. If missing, raise a friendly error with next steps.
+    Load required inputs. If missing, raise a friendly error with next steps.
     """
-    required = [
-        "data/combined_transactions.csv",
-        "data/control_decisions.csv",
-        "data/control_hits.csv",
-        "data/control_metrics.csv",
-    ]
-    missing = [p for p in required if not os.path.exists(p)]
+    missing = [p for p in REQUIRED_FILES if not os.path.exists(p)]
     if missing:
         raise FileNotFoundError(
             "Missing required file(s):\n"
@@ -61,14 +77,40 @@ def load_data() -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]
             "  python src/run_controls.py\n"
         )
 
-    tx = pd.read_csv("data/combined_transactions.csv")
-    decisions = pd.read_csv("data/control_decisions.csv")
-    hits = pd.read_csv("data/control_hits.csv")
-    metrics = pd.read_csv("data/control_metrics.csv")
+    tx = pd.read_parquet("data/combined_transactions.parquet")
+    decisions = pd.read_parquet("data/control_decisions.parquet")
+    hits = pd.read_parquet("data/control_hits.parquet")
+    metrics = pd.read_parquet("data/control_metrics.parquet")
 
     return tx, decisions, hits, metrics
 
 
+@st.cache_data
+def load_joined(mtimes: Tuple[float, ...]) -> pd.DataFrame:
+    """
+    Join decisions to the transaction rows to create one rich table for drill-down.
+    We join on a few stable keys (tx_id + rail) and keep fields consistent.
+
+    Cached so the merge runs once per data refresh, not on every widget interaction.
+    """
+    tx, decisions, _, _ = load_data(mtimes)
+    return decisions.merge(
+        tx,
+        on=["tx_id", "rail"],
+        how="left",
+        suffixes=("", "_tx"),
+    )
+
+
+@st.cache_data
+def control_hit_counts(mtimes: Tuple[float, ...]) -> pd.Series:
+    """Hits per control_id, most frequent first (for the noisy-controls table)."""
+    _, _, hits, _ = load_data(mtimes)
+    if hits.empty:
+        return pd.Series(dtype=int)
+    return hits["control_id"].value_counts()
+
+
 def safe_value_counts(series: pd.Series) -> pd.Series:
     """Return value counts even if series is missing or empty."""
     if series is None or series.empty:
@@ -79,22 +121,16 @@ def safe_value_counts(series: pd.Series) -> pd.Series:
 # -----------------------------
 # Small chart helpers
 # -----------------------------
-def bar_chart(series: pd.Series, title: str, xlabel: str = "", ylabel: str = "") -> None:
+def bar_chart(series: pd.Series, xlabel: str = "", ylabel: str = "") -> None:
     """
-    Render a basic bar chart using matplotlib.
-    Keeps charts consistent and lightweight for a GitHub portfolio project.
+    Render a basic bar chart with Streamlit's native (Vega-Lite) chart.
+    Only a small JSON spec goes to the browser; no figure is built per rerun.
     """
     if series.empty:
         st.info("No data to chart for current filters.")
         return
 
-    fig, ax = plt.subplots()
-    series.plot(kind="bar", ax=ax)
-    ax.set_title(title)
-    ax.set_xlabel(xlabel)
-    ax.set_ylabel(ylabel)
-    plt.xticks(rotation=0)
-    st.pyplot(fig)
+    st.bar_chart(series, x_label=xlabel, y_label=ylabel)
 
 
 def percent(numer: int, denom: int) -> str:
@@ -111,17 +147,10 @@ def main() -> None:
     st.title("🛡️ Payments Risk Controls Monitor")
     st.caption("Synthetic/mock data only. Config-driven controls across ACH, Card, and Crypto.")
 
-    # Load raw data
-    tx, decisions, hits, metrics = load_data()
-
-    # Join decisions to the transaction rows to create one rich table for drill-down.
-    # We join on a few stable keys (tx_id + rail) and keep fields consistent.
-    df = decisions.merge(
-        tx,
-        on=["tx_id", "rail"],
-        how="left",
-        suffixes=("", "_tx"),
-    )
+    # Load raw data (cached until the files on disk change)
+    mtimes = data_mtimes()
+    _, _, hits, metrics = load_data(mtimes)
+    df = load_joined(mtimes)
 
     # -----------------------------
     # Sidebar filters
@@ -149,22 +178,26 @@ def main() -> None:
         value=(float(min_amt), float(max_amt)),
     )
 
-    # Apply filters to the joined dataframe
-    filtered = df.copy()
+    # Apply filters to the joined dataframe: combine every filter into one
+    # boolean mask and index once, instead of materializing a frame per filter.
+    mask = np.ones(len(df), dtype=bool)
 
     if rail_choice != "ALL":
-        filtered = filtered[filtered["rail"] == rail_choice]
+        mask &= df["rail"].to_numpy() == rail_choice
 
     if action_choice != "ALL":
-        filtered = filtered[filtered["final_action"] == action_choice]
+        mask &= df["final_action"].to_numpy() == action_choice
 
-    if "amount" in filtered.columns:
-        filtered = filtered[(filtered["amount"] >= amt_low) & (filtered["amount"] <= amt_high)]
+    if "amount" in df.columns:
+        amounts = df["amount"].to_numpy()
+        mask &= (amounts >= amt_low) & (amounts <= amt_high)
 
     # Control filter: keep only tx_ids that fired that control
     if control_choice != "ALL" and not hits.empty:
-        tx_ids = set(hits[hits["control_id"] == control_choice]["tx_id"].tolist())
-        filtered = filtered[filtered["tx_id"].isin(tx_ids)]
+        tx_ids = hits.loc[hits["control_id"] == control_choice, "tx_id"].unique()
+        mask &= df["tx_id"].isin(tx_ids).to_numpy()
+
+    filtered = df.loc[mask]
 
     # -----------------------------
     # KPI row
@@ -172,9 +205,13 @@ def main() -> None:
     st.subheader("Portfolio KPIs")
 
     total = len(filtered)
-    allow_ct = int((filtered["final_action"] == "ALLOW").sum()) if total else 0
-    review_ct = int((filtered["final_action"] == "REVIEW").sum()) if total else 0
-    block_ct = int((filtered["final_action"] == "BLOCK").sum()) if total else 0
+    # One pass over final_action, reused by the KPIs and the distribution chart
+    action_counts = safe_value_counts(filtered["final_action"])
+    if total:
+        action_counts = action_counts.reindex(["ALLOW", "REVIEW", "BLOCK"], fill_value=0)
+    allow_ct = int(action_counts.get("ALLOW", 0))
+    review_ct = int(action_counts.get("REVIEW", 0))
+    block_ct = int(action_counts.get("BLOCK", 0))
 
     hit_ct = total - allow_ct  # anything not allow is "actioned"
 
@@ -194,8 +231,7 @@ def main() -> None:
 
     with left:
         st.markdown("### Final action distribution")
-        action_counts = safe_value_counts(filtered["final_action"])
-        bar_chart(action_counts, "Final action counts", xlabel="Action", ylabel="Count")
+        bar_chart(action_counts, xlabel="Action", ylabel="Count")
 
     with right:
         st.markdown("### Decision breakdown by rail")
@@ -203,7 +239,7 @@ def main() -> None:
             st.info("No rows for current filters.")
         else:
             pivot = (
-                filtered.groupby(["rail", "final_action"])
+                filtered.groupby(["rail", "final_action"], observed=True)
                 .size()
                 .unstack(fill_value=0)
             )
@@ -223,7 +259,7 @@ def main() -> None:
         if hits.empty:
             st.info("No control hits found. Run scoring again or adjust controls.")
         else:
-            noisy = hits["control_id"].value_counts().head(10)
+            noisy = control_hit_counts(mtimes).head(10)
             noisy_df = noisy.rename("hits").reset_index().rename(columns={"index": "control_id"})
             st.dataframe(noisy_df, use_container_width=True)
 
@@ -243,11 +279,13 @@ def main() -> None:
     # -----------------------------
     st.subheader("Flagged transactions (drill-down)")
 
-    # Sort so REVIEW/BLOCK appear first, then largest amounts
+    # Keep the top rows so REVIEW/BLOCK appear first, then largest amounts.
+    # nlargest is a partial sort, so we never order the full filtered table.
     rank = {"ALLOW": 0, "REVIEW": 1, "BLOCK": 2}
-    filtered = filtered.copy()
-    filtered["action_rank"] = filtered["final_action"].map(rank).fillna(0)
-    filtered = filtered.sort_values(by=["action_rank", "amount"], ascending=[False, False])
+    # final_action loads as a categorical; map on plain strings so the rank is numeric
+    top_rows = filtered.assign(
+        action_rank=filtered["final_action"].astype(str).map(rank).fillna(0)
+    ).nlargest(DRILLDOWN_MAX_ROWS, ["action_rank", "amount"])
 
     # Choose a readable set of columns for the table
     preferred_cols: List[str] = [
@@ -279,14 +317,22 @@ def main() -> None:
         # Label
         "is_fraud_pattern",
     ]
-    cols = [c for c in preferred_cols if c in filtered.columns]
-
-    # Show top 250 rows to keep it fast
-    st.dataframe(filtered[cols].head(250), use_container_width=True)
-    st.caption("Showing up to 250 rows. Use the left filters to narrow results.")
+    cols = [c for c in preferred_cols if c in top_rows.columns]
+
+    # Page through the top rows so only one page is sent to the browser per rerun
+    n_pages = max(1, math.ceil(len(top_rows) / DRILLDOWN_PAGE_SIZE))
+    page = int(st.number_input("Page", min_value=1, max_value=n_pages, value=1, step=1))
+    start = (page - 1) * DRILLDOWN_PAGE_SIZE
+    page_rows = top_rows[cols].iloc[start : start + DRILLDOWN_PAGE_SIZE]
+
+    st.dataframe(page_rows, use_container_width=True)
+    st.caption(
+        f"Page {page} of {n_pages} — top {len(top_rows):,} rows (max {DRILLDOWN_MAX_ROWS}). "
+        "Use the left filters to narrow results."
+    )
 
-    # Optional: raw hits table for transparency
-    with st.expander("Show raw control hits (long format)"):
+    # Optional: raw hits table for transparency (only rendered when switched on)
+    if st.checkbox("Show raw control hits (long format)", key="show_hits"):
         if hits.empty:
             st.info("No hits to display.")
         else:
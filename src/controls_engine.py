@@ -4,12 +4,12 @@ src/controls_engine.py
 A small config-driven controls engine.
 
 Reads controls from controls/controls.yaml and evaluates them against a unified
-transactions dataset (data/combined_transactions.csv).
+transactions dataset (data/combined_transactions.parquet).
 
-Outputs:
-- control_hits.csv      (long format: one row per tx-control hit)
-- control_decisions.csv (one row per transaction: final action + reasons)
-- control_metrics.csv   (monitoring summary per control)
+Outputs (Parquet, so dtypes survive and reloads are fast):
+- control_hits.parquet      (long format: one row per tx-control hit)
+- control_decisions.parquet (one row per transaction: final action + reasons)
+- control_metrics.parquet   (monitoring summary per control)
 
 Why this exists:
 Controls and monitoring are the layer above detection. Real risk teams need to know:
@@ -20,13 +20,25 @@ Controls and monitoring are the layer above detection. Real risk teams need to k
 
 from __future__ import annotations
 
+import contextlib
 import os
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import yaml
 
+try:
+    # Accelerator (listed in requirements.txt): fuses a control's numeric and
+    # boolean comparisons into one pass. Without it each condition runs separately.
+    import numexpr as ne
+except ImportError:  # pragma: no cover - engine still works without it
+    ne = None
+
 
 # -----------------------------
 # Data model
@@ -41,6 +53,11 @@ class Control:
     action: str  # ALLOW / REVIEW / BLOCK (we use REVIEW/BLOCK from YAML; ALLOW is default)
     description: str
     conditions: Dict[str, Any]
+    # (op, field, value) triples parsed from `conditions` once at load time
+    compiled: List[CompiledCondition] = field(init=False, default_factory=list)
+
+    def __post_init__(self) -> None:
+        self.compiled = compile_conditions(self.conditions)
 
 
 # -----------------------------
@@ -67,11 +84,79 @@ def load_controls(path: str = "controls/controls.yaml") -> List[Control]:
     return controls
 
 
+# Explicit dtypes for a combined transactions CSV. Without these, read_csv
+# falls back to int64/float64/object everywhere. Rail-specific fields are empty
+# on other rails, so they use pandas' nullable Int32/boolean dtypes.
+TX_DTYPES = {
+    "rail": "category",
+    "country": "category",
+    "currency": "category",
+    "funding_speed": "category",
+    "return_code": "category",
+    "account_age_days": "int32",
+    "wallet_age_days": "Int32",
+    "mcc": "Int32",
+    "bin": "Int32",
+    "card_present": "boolean",
+    "is_new_device": "boolean",
+    "to_is_high_risk": "boolean",
+    "is_fraud_pattern": "bool",
+}
+
+
+def read_transactions(path: str = "data/combined_transactions.parquet") -> pd.DataFrame:
+    """
+    Read the combined transactions dataset.
+
+    Parquet (the generator's default output) keeps its dtypes as written; a CSV
+    export is read with the compact TX_DTYPES map instead.
+    """
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path, dtype=TX_DTYPES, parse_dates=["timestamp"])
+
+
 def ensure_data_dir() -> None:
     """Ensure the data/ directory exists."""
     os.makedirs("data", exist_ok=True)
 
 
+# Low-cardinality string columns in the outputs. Stored as categoricals so
+# Parquet dictionary-encodes them and they load back as categoricals.
+OUTPUT_CATEGORICAL_COLUMNS = [
+    "rail",
+    "control_id",
+    "severity",
+    "action",
+    "description",
+    "final_action",
+    "triggered_actions",
+]
+
+
+# Rows converted to Arrow and written per Parquet row group
+WRITE_BATCH_ROWS = 250_000
+
+
+def write_parquet(df: pd.DataFrame, path: str, batch_rows: int = WRITE_BATCH_ROWS) -> None:
+    """
+    Write an output table to Parquet with low-cardinality strings as categoricals.
+
+    Rows are converted to Arrow and streamed to the file one batch at a time, so
+    only one batch's Arrow copy is held in memory alongside the DataFrame.
+    """
+    out = df.copy(deep=False)
+    for col in OUTPUT_CATEGORICAL_COLUMNS:
+        if col in out.columns:
+            out[col] = out[col].astype("category")
+
+    schema = pa.Schema.from_pandas(out, preserve_index=False)
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for start in range(0, len(out), batch_rows):
+            batch = out.iloc[start : start + batch_rows]
+            writer.write_table(pa.Table.from_pandas(batch, schema=schema, preserve_index=False))
+
+
 # -----------------------------
 # Condition evaluation helpers
 # -----------------------------
@@ -88,9 +173,84 @@ def _safe_series(df: pd.DataFrame, col: str) -> pd.Series:
     return pd.Series([pd.NA] * len(df), index=df.index)
 
 
-def build_mask_for_conditions(df: pd.DataFrame, conditions: Dict[str, Any]) -> pd.Series:
+# Ops that read a field through the numeric / lowercase-string caches. Those
+# fields are cast once per rail chunk by build_typed_caches rather than once per
+# condition, and only when one of the rail's controls actually uses them.
+NUMERIC_OPS = {"gt", "gte", "lt", "lte"}
+STRING_OPS = {"eq_str"}
+
+# Low-cardinality columns converted to pandas Categorical before evaluation so
+# membership checks compare small integer codes instead of hashing objects.
+CATEGORICAL_COLUMNS = ["rail", "country", "return_code", "funding_speed", "currency", "mcc"]
+
+
+def _as_bool_array(cond: pd.Series) -> np.ndarray:
+    """Convert a (possibly nullable) boolean Series to a plain ndarray; NA -> False."""
+    return cond.to_numpy(dtype=bool, na_value=False)
+
+
+def _isin(series: pd.Series, expected: List[Any]) -> pd.Series:
     """
-    Build a boolean mask for all conditions in a control.
+    Membership test for `field_in` conditions.
+
+    Categorical columns are matched on their integer codes; anything else falls
+    back to a regular hashed isin. As with isin, a null entry in `expected`
+    (YAML `null`) matches missing values.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        wanted = series.cat.categories.get_indexer(list(expected))
+        wanted = wanted[wanted >= 0]  # -1 means "not a category" (and is also the NA code)
+        if any(pd.api.types.is_scalar(v) and pd.isna(v) for v in expected):
+            wanted = np.append(wanted, -1)
+        codes = series.cat.codes.to_numpy()
+        return pd.Series(np.isin(codes, wanted), index=series.index)
+    return series.isin(expected)
+
+
+def build_typed_caches(
+    df: pd.DataFrame, conditions: Iterable[CompiledCondition]
+) -> Tuple[Dict[str, pd.Series], Dict[str, pd.Series]]:
+    """
+    Precompute dtype-coerced columns for a rail's transactions.
+
+    Only fields that `conditions` (the rail's compiled controls) read through a
+    numeric or string op are cached; other columns are never touched.
+
+    Returns:
+    - numeric: column -> pd.to_numeric(..., errors="coerce") result
+    - lowered: column -> lowercase string form used for exact matches
+    """
+    conditions = list(conditions)
+    numeric_fields = {field for op, field, _ in conditions if op in NUMERIC_OPS}
+    string_fields = {field for op, field, _ in conditions if op in STRING_OPS}
+
+    numeric = {
+        col: pd.to_numeric(df[col], errors="coerce")
+        for col in numeric_fields
+        if col in df.columns
+    }
+    lowered = {
+        col: df[col].astype(str).str.lower()
+        for col in string_fields
+        if col in df.columns
+    }
+    return numeric, lowered
+
+
+# Field aliases used in YAML (e.g. account_age_lt_days -> account_age_days)
+FIELD_ALIASES = {
+    "account_age": "account_age_days",
+    "wallet_age": "wallet_age_days",
+}
+
+# A parsed condition: (op, field, value). `value` is already in the form the
+# op compares against (float for comparisons, lowercase for string matches).
+CompiledCondition = Tuple[str, str, Any]
+
+
+def compile_conditions(conditions: Dict[str, Any]) -> List[CompiledCondition]:
+    """
+    Parse YAML condition keys into (op, field, value) triples.
 
     Supported condition patterns:
     - exact match: field: value
@@ -109,100 +269,169 @@ def build_mask_for_conditions(df: pd.DataFrame, conditions: Dict[str, Any]) -> p
 
     - booleans: is_new_device: true
       Handles boolean values stored as strings in CSV ("True"/"False").
+
+    This runs once per control at load time so the hot mask-building path does
+    no string parsing.
     """
-    mask = pd.Series([True] * len(df), index=df.index)
-
-    def coerce_bool_series(s: pd.Series) -> pd.Series:
-        """Convert True/False strings to booleans when needed."""
-        if s.dtype == bool:
-            return s
-        # Convert common string forms to boolean
-        mapped = (
-            s.astype(str)
-            .str.strip()
-            .str.lower()
-            .map({"true": True, "false": False})
-        )
-        # If mapping failed (NaN), keep original
-        return mapped.where(mapped.notna(), s)
+    compiled: List[CompiledCondition] = []
 
     for key, expected in conditions.items():
-        # 1) Handle membership list keys like return_code_in
+        # 1) Membership list keys like return_code_in
         if key.endswith("_in"):
-            field = key.replace("_in", "")
-            series = _safe_series(df, field)
-            mask &= series.isin(expected)
+            # A bare string would otherwise split into characters and silently match nothing
+            if not isinstance(expected, (list, tuple)):
+                raise ValueError(
+                    f"Condition '{key}' expects a list of values, got {expected!r}"
+                )
+            compiled.append(("in", key[: -len("_in")], list(expected)))
             continue
 
-        # 2) Handle *_lt_days / *_gt_days style keys (your YAML uses these)
-        day_suffix_ops = {
-            "_gt_days": "_gt",
-            "_gte_days": "_gte",
-            "_lt_days": "_lt",
-            "_lte_days": "_lte",
-        }
-        if any(key.endswith(suf) for suf in day_suffix_ops):
-            for suf, op in day_suffix_ops.items():
-                if key.endswith(suf):
-                    field = key[: -len(suf)]  # strip suffix
-                    break
-
-            # Normalize field names used in YAML
-            if field == "account_age":
-                field = "account_age_days"
-            if field == "wallet_age":
-                field = "wallet_age_days"
-
-            series = pd.to_numeric(_safe_series(df, field), errors="coerce")
-
-            if op == "_gt":
-                mask &= series > float(expected)
-            elif op == "_gte":
-                mask &= series >= float(expected)
-            elif op == "_lt":
-                mask &= series < float(expected)
-            elif op == "_lte":
-                mask &= series <= float(expected)
+        # 2) *_lt_days / *_gt_days style keys, then 3) regular keys like amount_gt
+        op = None
+        for suffix in ["_gt_days", "_gte_days", "_lt_days", "_lte_days", "_gt", "_gte", "_lt", "_lte"]:
+            if key.endswith(suffix):
+                op = suffix.strip("_").replace("_days", "")
+                field = key[: -len(suffix)]
+                break
 
+        if op is not None:
+            field = FIELD_ALIASES.get(field, field)
+            compiled.append((op, field, float(expected)))
             continue
 
-        # 3) Handle regular comparison keys like amount_gt
-        for op in ["_gt", "_gte", "_lt", "_lte"]:
-            if key.endswith(op):
-                field = key.replace(op, "")
-
-                # Normalize field names
-                if field == "account_age":
-                    field = "account_age_days"
-                if field == "wallet_age":
-                    field = "wallet_age_days"
-
-                series = pd.to_numeric(_safe_series(df, field), errors="coerce")
-
-                if op == "_gt":
-                    mask &= series > float(expected)
-                elif op == "_gte":
-                    mask &= series >= float(expected)
-                elif op == "_lt":
-                    mask &= series < float(expected)
-                elif op == "_lte":
-                    mask &= series <= float(expected)
-                break
+        # 4) Exact match
+        if isinstance(expected, bool):
+            compiled.append(("eq_bool", key, expected))
+        elif isinstance(expected, str):
+            compiled.append(("eq_str", key, expected.lower()))
+        else:
+            compiled.append(("eq", key, expected))
+
+    return compiled
+
+
+# Ops that can be fused into a single numexpr kernel (numeric comparisons and
+# boolean flags) and the operator each one becomes.
+FUSABLE_OPS = {"gt": ">", "gte": ">=", "lt": "<", "lte": "<=", "eq_bool": "=="}
+
+
+def fused_numeric_expr(
+    conditions: List[CompiledCondition],
+) -> Optional[Tuple[str, List[CompiledCondition]]]:
+    """
+    Build one numexpr expression for all numeric/boolean conditions in a control.
+
+    ex: [("gt", "amount", 800.0), ("eq_bool", "is_new_device", True)]
+        -> ("(v0 > 800.0) & (v1 == 1.0)", <the two conditions>)
+
+    Boolean flags are fed in as 1.0 / 0.0 / NaN so they compare like numbers
+    (and missing values never match). Fields are bound to positional names so
+    any column name is safe. Returns None when fewer than two conditions can be
+    fused (nothing to gain).
+    """
+    parts: List[str] = []
+    fused: List[CompiledCondition] = []
+    for op, field, value in conditions:
+        if op in FUSABLE_OPS:
+            parts.append(f"(v{len(fused)} {FUSABLE_OPS[op]} {float(value)!r})")
+            fused.append((op, field, value))
+    if len(parts) < 2:
+        return None
+    return " & ".join(parts), fused
+
+
+def _coerce_bool_series(s: pd.Series) -> pd.Series:
+    """
+    Convert a flag column to booleans when needed.
+
+    Columns already read as bool / nullable boolean are returned as-is (the
+    common case with TX_DTYPES). Otherwise True/False values and their string
+    forms ("True", "false", ...) map to booleans and anything else becomes NA.
+    """
+    if s.dtype == bool or isinstance(s.dtype, pd.BooleanDtype):
+        return s
+
+    arr = s.to_numpy(dtype=object, na_value=None)
+    text = np.char.lower(np.char.strip(arr.astype(str)))
+    is_true = (arr == True) | (text == "true")  # noqa: E712
+    is_false = (arr == False) | (text == "false")  # noqa: E712
+
+    out = pd.array(is_true, dtype="boolean")
+    out[~(is_true | is_false)] = pd.NA
+    return pd.Series(out, index=s.index)
+
+
+def build_mask_for_conditions(
+    df: pd.DataFrame,
+    conditions: Union[Dict[str, Any], List[CompiledCondition]],
+    numeric: Optional[Dict[str, pd.Series]] = None,
+    lowered: Optional[Dict[str, pd.Series]] = None,
+) -> pd.Series:
+    """
+    Build a boolean mask for all conditions in a control.
+
+    `conditions` is either a control's precompiled list (Control.compiled) or a
+    raw YAML conditions dict, which is compiled on the fly. See
+    compile_conditions for the supported patterns.
+
+    `numeric` / `lowered` are optional caches from build_typed_caches.
+    Fields missing from the caches are coerced on the fly.
+    """
+    if isinstance(conditions, dict):
+        conditions = compile_conditions(conditions)
+
+    # AND each condition into one bool buffer in place; wrap as a Series once at the end.
+    mask = np.ones(len(df), dtype=bool)
+    numeric = numeric or {}
+    lowered = lowered or {}
+
+    def numeric_series(field: str) -> pd.Series:
+        """Return the cached numeric column, or coerce it now."""
+        if field in numeric:
+            return numeric[field]
+        return pd.to_numeric(_safe_series(df, field), errors="coerce")
+
+    def lowered_series(field: str) -> pd.Series:
+        """Return the cached lowercase column, or compute it now."""
+        if field in lowered:
+            return lowered[field]
+        return _safe_series(df, field).astype(str).str.lower()
+
+    ops = {
+        "in": lambda field, value: _isin(_safe_series(df, field), value),
+        "gt": lambda field, value: numeric_series(field) > value,
+        "gte": lambda field, value: numeric_series(field) >= value,
+        "lt": lambda field, value: numeric_series(field) < value,
+        "lte": lambda field, value: numeric_series(field) <= value,
+        "eq_bool": lambda field, value: _coerce_bool_series(_safe_series(df, field)) == value,
+        "eq_str": lambda field, value: lowered_series(field) == value,
+        "eq": lambda field, value: _safe_series(df, field) == value,
+    }
+
+    def fused_input(op: str, field: str) -> np.ndarray:
+        """float64 input for the fused kernel (booleans as 1.0 / 0.0 / NaN)."""
+        if op == "eq_bool":
+            series = _coerce_bool_series(_safe_series(df, field))
         else:
-            # 4) Exact match
-            field = key
-            series = _safe_series(df, field)
+            series = numeric_series(field)
+        return series.to_numpy(dtype="float64", na_value=np.nan)
+
+    # With numexpr installed, evaluate all numeric/boolean conditions as one fused
+    # kernel (no per-condition temporaries; numexpr caches the compiled expression).
+    fused = fused_numeric_expr(conditions) if ne is not None else None
+    if fused is not None:
+        expr, fused_conditions = fused
+        arrays = {
+            f"v{i}": fused_input(op, field)
+            for i, (op, field, _) in enumerate(fused_conditions)
+        }
+        np.logical_and(mask, ne.evaluate(expr, local_dict=arrays), out=mask)
+        conditions = [c for c in conditions if c[0] not in FUSABLE_OPS]
 
-            # If YAML expects bool, coerce series to bool where possible
-            if isinstance(expected, bool):
-                series = coerce_bool_series(series)
-                mask &= series == expected
-            elif isinstance(expected, str):
-                mask &= series.astype(str).str.lower() == expected.lower()
-            else:
-                mask &= series == expected
+    for op, field, value in conditions:
+        np.logical_and(mask, _as_bool_array(ops[op](field, value)), out=mask)
 
-    return mask.fillna(False)
+    return pd.Series(mask, index=df.index)
 
 
 # -----------------------------
@@ -216,6 +445,21 @@ ACTION_PRIORITY = {
 }
 
 
+# Max transactions evaluated at once per rail (bounds peak memory on large inputs)
+EVAL_CHUNK_ROWS = 1_000_000
+
+HIT_COLUMNS = ["tx_id", "rail", "control_id", "severity", "action", "description"]
+
+# Arrow schema for hits streamed to Parquet: low-cardinality strings are
+# dictionary-encoded (each row group carries the values it uses, and they load
+# back as categoricals).
+HIT_SCHEMA = pa.schema(
+    [("tx_id", pa.string())]
+    + [(col, pa.dictionary(pa.int32(), pa.string())) for col in HIT_COLUMNS[1:]]
+)
+METRIC_COLUMNS = ["control_id", "hits", "hit_rate", "precision_proxy"]
+
+
 def resolve_final_action(actions: List[str]) -> str:
     """
     Given multiple actions triggered for a transaction, return the highest priority action.
@@ -225,111 +469,224 @@ def resolve_final_action(actions: List[str]) -> str:
     return max(actions, key=lambda a: ACTION_PRIORITY.get(a, 0))
 
 
+def _summarize_hit_pattern(controls: List[Control], pattern: np.ndarray) -> Tuple[str, str, str]:
+    """
+    Given which controls fired for a transaction (one bool per control), return
+    (triggered_controls, triggered_actions, final_action).
+    """
+    fired = [c for c, hit in zip(controls, pattern) if hit]
+    actions = set(c.action for c in fired)
+    return (
+        ", ".join(sorted(set(c.control_id for c in fired))),
+        ", ".join(sorted(actions)),
+        resolve_final_action(list(actions)),
+    )
+
+
+def _hits_frame(
+    tx: pd.DataFrame,
+    control_attrs: Dict[str, np.ndarray],
+    control_idx: np.ndarray,
+    row_idx: np.ndarray,
+) -> pd.DataFrame:
+    """Build HIT_COLUMNS rows for hits given as (control index, tx position) pairs."""
+    return pd.DataFrame(
+        {
+            "tx_id": tx["tx_id"].iloc[row_idx].to_numpy(),
+            "rail": tx["rail"].iloc[row_idx].reset_index(drop=True),
+            **{attr: values[control_idx] for attr, values in control_attrs.items()},
+        },
+        columns=HIT_COLUMNS,
+    )
+
+
 def evaluate_controls(
     tx: pd.DataFrame,
     controls: List[Control],
-) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    chunk_rows: int = EVAL_CHUNK_ROWS,
+    hits_path: Optional[str] = None,
+) -> Tuple[pd.DataFrame, Optional[pd.DataFrame], pd.DataFrame]:
     """
     Evaluate controls against the transactions dataframe.
 
+    Each rail is processed in chunks of at most `chunk_rows` transactions, so the
+    typed column caches, per-control temporaries and hit masks stay bounded on
+    large inputs; beyond the per-transaction outputs, memory grows with hits.
+
+    With `hits_path`, each chunk's hits are written to that Parquet file as soon
+    as they are found and hits_df is returned as None, so the full hits table is
+    never held in memory. Streamed hits are ordered by rail, then chunk, then
+    control (config order), then transaction; the in-memory hits_df is ordered
+    by control (config order), then transaction.
+
     Returns:
     - decisions_df: one row per transaction with final action + reasons
-    - hits_df: long-form table listing each (tx_id, control_id) hit
+    - hits_df: long-form table listing each (tx_id, control_id) hit, or None
+      when the hits were streamed to `hits_path`
     - metrics_df: monitoring summary per control
     """
     # Make sure core columns exist
     required_cols = ["tx_id", "rail", "timestamp", "user_id", "amount", "is_fraud_pattern"]
     for c in required_cols:
         if c not in tx.columns:
-            raise ValueError(f"Missing required column '{c}' in combined_transactions.csv")
-
-    hit_rows: List[Dict[str, Any]] = []
-
-    # Evaluate each control only on the rows for its rail
-    for control in controls:
-        rail_df = tx[tx["rail"] == control.rail].copy()
-        if rail_df.empty:
-            continue
-
-        mask = build_mask_for_conditions(rail_df, control.conditions)
-        hits = rail_df[mask]
-
-        # Record each hit as a row (long format)
-        for _, row in hits.iterrows():
-            hit_rows.append(
-                {
-                    "tx_id": row["tx_id"],
-                    "rail": row["rail"],
-                    "control_id": control.control_id,
-                    "severity": control.severity,
-                    "action": control.action,
-                    "description": control.description,
-                }
-            )
-
-    hits_df = pd.DataFrame(hit_rows)
-
-    # Build decisions: one row per tx_id
-    decisions = tx[["tx_id", "rail", "timestamp", "user_id", "amount", "is_fraud_pattern"]].copy()
-
-    if hits_df.empty:
-        # No hits at all — everything ALLOW
-        decisions["final_action"] = "ALLOW"
-        decisions["triggered_controls"] = ""
-        decisions["triggered_actions"] = ""
-    else:
-        # Group hits per transaction
-        grouped = hits_df.groupby("tx_id").agg(
-            triggered_controls=("control_id", lambda s: ", ".join(sorted(set(s)))),
-            triggered_actions=("action", lambda s: ", ".join(sorted(set(s)))),
-            final_action=("action", lambda s: resolve_final_action(list(set(s)))),
+            raise ValueError(f"Missing required column '{c}' in combined transactions")
+
+    # Work on a shallow copy so the caller's frame keeps its original dtypes
+    tx = tx.copy(deep=False)
+    for col in CATEGORICAL_COLUMNS:
+        if col in tx.columns:
+            tx[col] = tx[col].astype("category")
+
+    # Split transactions by rail once up front (as row positions into tx).
+    rail_positions = tx.groupby("rail", sort=False, observed=True).indices
+
+    # Partition controls by rail (keeping each control's index in config order)
+    controls_by_rail: Dict[str, List[Tuple[int, Control]]] = defaultdict(list)
+    for i, control in enumerate(controls):
+        controls_by_rail[control.rail].append((i, control))
+
+    # Build decisions: one row per tx_id. Transactions with no hits are ALLOW.
+    decisions = tx[
+        ["tx_id", "rail", "timestamp", "user_id", "amount", "is_fraud_pattern"]
+    ].reset_index(drop=True)
+    triggered_controls = np.full(len(tx), "", dtype=object)
+    triggered_actions = np.full(len(tx), "", dtype=object)
+    final_action = np.full(len(tx), "ALLOW", dtype=object)
+
+    # Hits as (control index, tx position) pairs, collected chunk by chunk
+    # (only when they are kept in memory rather than streamed to hits_path)
+    hit_control_idx: List[np.ndarray] = []
+    hit_row_idx: List[np.ndarray] = []
+    control_attrs = {
+        attr: np.array([getattr(c, attr) for c in controls], dtype=object)
+        for attr in ["control_id", "severity", "action", "description"]
+    }
+
+    # Monitoring totals per control (config index). "is_fraud_pattern" is a
+    # synthetic label used to approximate effectiveness; NaN labels are skipped.
+    labels = tx["is_fraud_pattern"].to_numpy(dtype="float64", na_value=np.nan)
+    hit_counts = np.zeros(len(controls), dtype=np.int64)
+    label_counts = np.zeros(len(controls))
+    label_sums = np.zeros(len(controls))
+
+    # Evaluate each rail's controls only on that rail's rows, one chunk at a time.
+    # Typed caches and the chunk's hit masks are built once per chunk, shared by
+    # all of the rail's controls, and dropped before the next chunk.
+    hits_writer = (
+        pq.ParquetWriter(hits_path, HIT_SCHEMA, compression="zstd")
+        if hits_path is not None
+        else contextlib.nullcontext()
+    )
+    with hits_writer as writer:
+        for rail, rail_entries in controls_by_rail.items():
+            positions = rail_positions.get(rail)
+            if positions is None:
+                continue
+
+            rail_control_idx = np.array([i for i, _ in rail_entries])
+            rail_controls = [control for _, control in rail_entries]
+            rail_conditions = [cond for control in rail_controls for cond in control.compiled]
+
+            # Reason strings and final action per distinct hit pattern, reused
+            # across chunks (only a handful of patterns exist)
+            summary_by_pattern: Dict[bytes, Tuple[str, str, str]] = {}
+
+            for start in range(0, len(positions), chunk_rows):
+                chunk_pos = positions[start : start + chunk_rows]
+                chunk_df = tx.iloc[chunk_pos]
+                numeric, lowered = build_typed_caches(chunk_df, rail_conditions)
+
+                # One row per rail control, one column per transaction in the chunk
+                chunk_masks = np.empty((len(rail_controls), len(chunk_pos)), dtype=bool)
+                for j, control in enumerate(rail_controls):
+                    mask = build_mask_for_conditions(chunk_df, control.compiled, numeric, lowered)
+                    chunk_masks[j] = mask.to_numpy()
+
+                # All of the chunk's hits in one vectorized pass, mapped back to
+                # config-wide control indices and tx positions
+                control_j, chunk_row = np.nonzero(chunk_masks)
+                chunk_control_idx = rail_control_idx[control_j]
+                chunk_row_idx = chunk_pos[chunk_row]
+
+                # Per-control hit counts and label totals for the metrics
+                chunk_labels = labels[chunk_row_idx]
+                labeled = ~np.isnan(chunk_labels)
+                n_controls = len(controls)
+                hit_counts += np.bincount(chunk_control_idx, minlength=n_controls)
+                label_counts += np.bincount(chunk_control_idx, labeled, minlength=n_controls)
+                label_sums += np.bincount(
+                    chunk_control_idx[labeled], chunk_labels[labeled], minlength=n_controls
+                )
+
+                if writer is None:
+                    hit_control_idx.append(chunk_control_idx)
+                    hit_row_idx.append(chunk_row_idx)
+                elif len(chunk_control_idx):
+                    chunk_hits = _hits_frame(tx, control_attrs, chunk_control_idx, chunk_row_idx)
+                    chunk_hits = chunk_hits.astype(dict.fromkeys(HIT_COLUMNS[1:], "category"))
+                    writer.write_table(
+                        pa.Table.from_pandas(chunk_hits, preserve_index=False).cast(HIT_SCHEMA)
+                    )
+
+                # Each hit transaction's column in chunk_masks is its hit pattern, so
+                # the summary is built once per distinct pattern and broadcast back.
+                any_hit = chunk_masks.any(axis=0)
+                if not any_hit.any():
+                    continue
+                patterns, inverse = np.unique(
+                    chunk_masks[:, any_hit].T, axis=0, return_inverse=True
+                )
+                for p in patterns:
+                    if p.tobytes() not in summary_by_pattern:
+                        summary_by_pattern[p.tobytes()] = _summarize_hit_pattern(rail_controls, p)
+                summaries = np.array(
+                    [summary_by_pattern[p.tobytes()] for p in patterns], dtype=object
+                )[inverse.reshape(-1)]
+
+                hit_pos = chunk_pos[any_hit]
+                triggered_controls[hit_pos] = summaries[:, 0]
+                triggered_actions[hit_pos] = summaries[:, 1]
+                final_action[hit_pos] = summaries[:, 2]
+
+    decisions["triggered_controls"] = triggered_controls
+    decisions["triggered_actions"] = triggered_actions
+    decisions["final_action"] = final_action
+
+    # Record each hit as a row (long format), grouped by control in config order
+    # and by transaction order within a control. A stable sort on the control
+    # index is enough: a control's hits arrive chunk by chunk in ascending
+    # position, since each rail's positions are already ascending.
+    hits_df = None
+    if hits_path is None:
+        empty = np.array([], dtype=np.int64)
+        control_idx = np.concatenate(hit_control_idx) if hit_control_idx else empty
+        row_idx = np.concatenate(hit_row_idx) if hit_row_idx else empty
+        order = np.argsort(control_idx, kind="stable")
+        hits_df = _hits_frame(tx, control_attrs, control_idx[order], row_idx[order])
+
+    # Monitoring metrics per control, from the totals gathered chunk by chunk
+    # (controls sharing a control_id are combined).
+    if hit_counts.any():
+        per_control = pd.DataFrame(
+            {
+                "control_id": control_attrs["control_id"],
+                "hits": hit_counts,
+                "label_counts": label_counts,
+                "label_sums": label_sums,
+            }
         )
-
-        decisions = decisions.merge(grouped, on="tx_id", how="left")
-        decisions["final_action"] = decisions["final_action"].fillna("ALLOW")
-        decisions["triggered_controls"] = decisions["triggered_controls"].fillna("")
-        decisions["triggered_actions"] = decisions["triggered_actions"].fillna("")
-
-    # Monitoring metrics per control:
-    # We use "is_fraud_pattern" as a synthetic label to approximate effectiveness.
-    metrics_rows: List[Dict[str, Any]] = []
-    if not hits_df.empty:
-        # Join hits to label and amount info
-        labeled_hits = hits_df.merge(
-            tx[["tx_id", "is_fraud_pattern", "amount", "rail"]],
-            on=["tx_id", "rail"],
-            how="left",
-        )
-
-        total_tx = len(tx)
-        for control_id, g in labeled_hits.groupby("control_id"):
-            hits_count = len(g)
-            hit_rate = hits_count / total_tx
-
-            # "Precision-ish": of the control hits, how many were labeled as fraud pattern?
-            # This is a synthetic proxy, not a real-world metric.
-            if "is_fraud_pattern" in g.columns:
-                precision_proxy = float(g["is_fraud_pattern"].mean())
-            else:
-                precision_proxy = 0.0
-
-            metrics_rows.append(
-                {
-                    "control_id": control_id,
-                    "hits": hits_count,
-                    "hit_rate": round(hit_rate, 4),
-                    "precision_proxy": round(precision_proxy, 4),
-                }
-            )
-
-        # Build metrics_df safely (even when no controls fired)
-    if metrics_rows:
-        metrics_df = pd.DataFrame(metrics_rows).sort_values(by="hits", ascending=False)
+        metrics_df = per_control.groupby("control_id").sum().reset_index()
+        metrics_df = metrics_df[metrics_df["hits"] > 0].reset_index(drop=True)
+
+        # "Precision-ish": of the control hits, how many were labeled as fraud pattern?
+        # This is a synthetic proxy, not a real-world metric.
+        labeled_hits = metrics_df["label_counts"].where(metrics_df["label_counts"] > 0)
+        metrics_df["precision_proxy"] = (metrics_df["label_sums"] / labeled_hits).round(4)
+        metrics_df["hit_rate"] = (metrics_df["hits"] / len(tx)).round(4)
+        metrics_df = metrics_df[METRIC_COLUMNS].sort_values(by="hits", ascending=False)
     else:
-        # Create an empty metrics table with the expected columns
-        metrics_df = pd.DataFrame(
-            columns=["control_id", "hits", "hit_rate", "precision_proxy"]
-        )
+        # Create an empty metrics table with the expected columns (no controls fired)
+        metrics_df = pd.DataFrame(columns=METRIC_COLUMNS)
 
     return decisions, hits_df, metrics_df
 
@@ -340,29 +697,31 @@ def run() -> None:
     """
     ensure_data_dir()
 
-    tx_path = "data/combined_transactions.csv"
+    tx_path = "data/combined_transactions.parquet"
     if not os.path.exists(tx_path):
         raise FileNotFoundError(
-            "Missing data/combined_transactions.csv. Run: python src/generate_synthetic_data.py"
+            "Missing data/combined_transactions.parquet. Run: python src/generate_synthetic_data.py"
         )
 
-    tx = pd.read_csv(tx_path)
+    tx = read_transactions(tx_path)
 
     controls = load_controls("controls/controls.yaml")
 
-    decisions_df, hits_df, metrics_df = evaluate_controls(tx, controls)
+    # Hits are streamed to Parquet chunk by chunk during evaluation
+    decisions_df, _, metrics_df = evaluate_controls(
+        tx, controls, hits_path="data/control_hits.parquet"
+    )
 
     # Write outputs (these are gitignored)
-    decisions_df.to_csv("data/control_decisions.csv", index=False)
-    hits_df.to_csv("data/control_hits.csv", index=False)
-    metrics_df.to_csv("data/control_metrics.csv", index=False)
+    write_parquet(decisions_df, "data/control_decisions.parquet")
+    write_parquet(metrics_df, "data/control_metrics.parquet")
 
     print("✅ Controls evaluated")
     print(f"- Transactions: {len(tx):,}")
-    print(f"- Hits rows: {len(hits_df):,}")
-    print(f"- Decisions written: data/control_decisions.csv")
-    print(f"- Hits written: data/control_hits.csv")
-    print(f"- Metrics written: data/control_metrics.csv")
+    print(f"- Hits rows: {int(metrics_df['hits'].sum()):,}")
+    print(f"- Decisions written: data/control_decisions.parquet")
+    print(f"- Hits written: data/control_hits.parquet")
+    print(f"- Metrics written: data/control_metrics.parquet")
 
 
 if __name__ == "__main__":
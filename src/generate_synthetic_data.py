@@ -11,259 +11,328 @@ Risk teams often need a unified view of activity across rails so controls, monit
 and investigation workflows can be consistent.
 
 Output:
-- data/combined_transactions.csv
+- data/combined_transactions.parquet
+- data/combined_transactions.csv (only with --csv)
 
 Notes:
 - This is synthetic/mock data only (safe for public GitHub).
 - Fields are normalized so a controls engine can evaluate them consistently.
+- Draws are seeded (SYNTH_SEED, default 42); timestamps are relative to the run time.
 """
 
 from __future__ import annotations
 
+import argparse
 import os
-import random
-from datetime import datetime, timedelta
-from typing import Dict, List
-
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import Dict, Iterable, Iterator
+
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+# One PCG64 generator for every draw in this module (batched NumPy calls
+# instead of per-value stdlib random calls), seeded so runs are reproducible.
+# Override with SYNTH_SEED=<int> for a different dataset.
+SEED = int(os.environ.get("SYNTH_SEED", 42))
+_RNG = np.random.default_rng(SEED)
+
+
+# -----------------------------
+# Weighted categorical options
+# -----------------------------
+# Cumulative weights are computed once here, not on every draw.
+
+# Country mix (simple)
+COUNTRY_OPTIONS = np.array(["US", "CA", "GB", "MX", "NG", "BR", "IN"])
+COUNTRY_CUM = np.cumsum([0.65, 0.08, 0.08, 0.06, 0.04, 0.05, 0.04])
+
+# ACH funding speed
+FUNDING_OPTIONS = np.array(["instant", "standard"])
+FUNDING_CUM = np.cumsum([0.25, 0.75])
+
+# Example MCCs: add some known riskier categories
+MCC_OPTIONS = np.array([5411, 5812, 5999, 5732, 5967, 4829, 7995])
+MCC_CUM = np.cumsum([0.25, 0.25, 0.12, 0.15, 0.08, 0.08, 0.07])
+
+# BINs: pretend these represent issuers; some bins appear more
+BIN_OPTIONS = np.array([400001, 400002, 510001, 510002, 378001])
+BIN_CUM = np.cumsum([0.30, 0.15, 0.25, 0.20, 0.10])
 
 
 # -----------------------------
 # Helper utilities
 # -----------------------------
 
+DATA_DIR = Path("data")
+
+
 def ensure_data_dir() -> None:
     """Ensure the data/ directory exists."""
-    os.makedirs("data", exist_ok=True)
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def rand_date_within_days(days_back: int = 30) -> str:
+@contextmanager
+def atomic_path(path: Path) -> Iterator[Path]:
+    """
+    Yield a temporary sibling of `path` to write to, then rename it over `path`.
+    Readers never see a half-written file; on error the temp file is removed.
     """
-    Return a random ISO timestamp within the last `days_back` days.
-    Example: 2025-12-15T10:22:31
+    tmp = path.with_name(f".{path.name}.tmp")
+    try:
+        yield tmp
+        tmp.replace(path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def rand_dates_within_days(rng: np.random.Generator, n: int, days_back: int = 30) -> np.ndarray:
+    """
+    Return n random timestamps within the last `days_back` days, as datetime64[s].
+    Example value: 2025-12-15T10:22:31
+
+    Offsets are whole days plus whole minutes back from now, drawn for all rows
+    at once instead of building one datetime per row.
     """
-    now = datetime.now()
-    delta = timedelta(days=random.randint(0, days_back), minutes=random.randint(0, 1440))
-    ts = now - delta
-    return ts.replace(microsecond=0).isoformat()
+    now = np.datetime64(datetime.now().replace(microsecond=0), "s")
+    offsets = rng.integers(0, days_back + 1, n) * 86400 + rng.integers(0, 1441, n) * 60
+    return now - offsets.astype("timedelta64[s]")
 
 
-def weighted_choice(options: List[str], weights: List[float]) -> str:
-    """Pick one item from options using weights."""
-    return random.choices(options, weights=weights, k=1)[0]
+def weighted_choices(
+    options: np.ndarray, cum_weights: np.ndarray, rng: np.random.Generator, n: int
+) -> np.ndarray:
+    """Draw n items from options at once via searchsorted on cumulative weights."""
+    idx = np.searchsorted(cum_weights, rng.random(n) * cum_weights[-1], side="right")
+    return options[np.minimum(idx, len(options) - 1)]
 
 
-def make_id(prefix: str, n: int) -> str:
-    """Create deterministic-ish IDs like ach_tx_000123."""
-    return f"{prefix}_{n:06d}"
+def draw_amounts(
+    rng: np.random.Generator, n: int, mean: float, std: float, lo: float, hi: float, decimals: int = 2
+) -> np.ndarray:
+    """
+    Draw n amounts as |Normal(mean, std)|, rounded and clipped to [lo, hi].
+    abs/round/clip all write into the one drawn buffer (no temporaries).
+    """
+    amount = rng.normal(mean, std, n)
+    np.abs(amount, out=amount)
+    np.round(amount, decimals, out=amount)
+    np.clip(amount, lo, hi, out=amount)
+    return amount
+
+
+def make_ids(prefix: str, numbers: np.ndarray, width: int = 6) -> np.ndarray:
+    """
+    Create deterministic-ish IDs like ach_tx_000123 for a whole array of numbers.
+    Formatting runs in np.char rather than one f-string per ID.
+    """
+    return np.char.add(f"{prefix}_", np.char.zfill(np.asarray(numbers).astype(str), width))
 
 
 # -----------------------------
 # Synthetic "entity" generators
 # -----------------------------
 
-def generate_users(n_users: int = 500) -> pd.DataFrame:
+def generate_users(n_users: int = 500, rng: np.random.Generator = _RNG) -> pd.DataFrame:
     """
     Generate synthetic users. Users can show up across ACH/card/crypto activity.
     """
-    rows: List[Dict] = []
-    for i in range(n_users):
-        user_id = f"user_{i:05d}"
-
-        # Account age: skew older, but keep some newer accounts for risk patterns
-        account_age_days = int(max(1, random.gauss(mu=120, sigma=90)))
-        account_age_days = min(account_age_days, 1000)
-
-        # Country mix (simple)
-        country = weighted_choice(
-            ["US", "CA", "GB", "MX", "NG", "BR", "IN"],
-            [0.65, 0.08, 0.08, 0.06, 0.04, 0.05, 0.04],
-        )
-
-        # Device IDs: users have a "primary" device; we'll inject device-sharing later.
-        device_id = f"dev_{random.randint(1, 350):05d}"
-
-        rows.append(
-            {
-                "user_id": user_id,
-                "account_age_days": account_age_days,
-                "country": country,
-                "device_id": device_id,
-            }
-        )
-
-    return pd.DataFrame(rows)
+    # Account age: skew older, but keep some newer accounts for risk patterns
+    account_age_days = np.minimum(np.maximum(1, rng.normal(120, 90, n_users)).astype(int), 1000)
+
+    # Country mix (simple)
+    country = weighted_choices(COUNTRY_OPTIONS, COUNTRY_CUM, rng, n_users)
+
+    # Device IDs: users have a "primary" device; we'll inject device-sharing later.
+    device_num = rng.integers(1, 351, n_users)
+
+    return pd.DataFrame(
+        {
+            "user_id": make_ids("user", np.arange(n_users), width=5),
+            "account_age_days": account_age_days,
+            "country": country,
+            "device_id": make_ids("dev", device_num, width=5),
+        }
+    )
 
 
-def generate_wallets(users: pd.DataFrame) -> pd.DataFrame:
+def generate_wallets(users: pd.DataFrame, rng: np.random.Generator = _RNG) -> pd.DataFrame:
     """
     Generate one wallet per user (simplified). Crypto rails evaluate wallet_age_days, etc.
     """
-    rows: List[Dict] = []
-    for idx, row in users.iterrows():
-        wallet_id = f"w_{idx:06d}"
-
-        # Wallet age loosely follows account age, but can be newer.
-        wallet_age_days = max(1, int(row["account_age_days"] * random.uniform(0.2, 1.0)))
-
-        # Some wallets are exchange-linked (common in real crypto compliance contexts)
-        is_exchange_linked = random.random() < 0.25
-
-        rows.append(
-            {
-                "wallet_id": wallet_id,
-                "user_id": row["user_id"],
-                "wallet_age_days": wallet_age_days,
-                "is_exchange_linked": is_exchange_linked,
-            }
-        )
+    n = len(users)
 
-    return pd.DataFrame(rows)
+    # Wallet age loosely follows account age, but can be newer.
+    wallet_age_days = np.maximum(
+        1, (users["account_age_days"].to_numpy() * rng.uniform(0.2, 1.0, n)).astype(int)
+    )
+
+    # Some wallets are exchange-linked (common in real crypto compliance contexts)
+    is_exchange_linked = rng.random(n) < 0.25
+
+    return pd.DataFrame(
+        {
+            "wallet_id": make_ids("w", users.index.to_numpy()),
+            "user_id": users["user_id"].to_numpy(),
+            "wallet_age_days": wallet_age_days,
+            "is_exchange_linked": is_exchange_linked,
+        }
+    )
 
 
 # -----------------------------
 # Transaction generators by rail
 # -----------------------------
-
-def generate_ach_transactions(users: pd.DataFrame, n: int = 2000) -> pd.DataFrame:
+# Each generator only builds the columns its rail uses; pd.concat in main()
+# aligns them into the unified schema below (other rails' fields are empty).
+
+TX_COLUMNS = [
+    "tx_id", "rail", "timestamp", "user_id", "device_id", "country",
+    "account_age_days", "amount", "currency",
+    # ACH fields
+    "funding_speed", "return_code",
+    # Card fields
+    "card_present", "mcc", "bin", "is_new_device",
+    # Crypto fields
+    "from_wallet_id", "to_wallet_id", "wallet_age_days", "to_is_high_risk",
+]
+
+STRING_COLUMNS = ["tx_id", "user_id", "device_id", "from_wallet_id", "to_wallet_id"]
+
+# Low-cardinality strings are stored as categoricals (small integer codes, cheap
+# comparisons); their categories are unified across rails in main().
+CATEGORY_COLUMNS = ["rail", "country", "currency", "funding_speed", "return_code"]
+
+# Output dtypes (matching TX_DTYPES in src/controls_engine.py). Ages, MCCs and
+# BINs all fit in 32 bits; rail-specific ones are empty on other rails, so they
+# are nullable Int32. Flags are nullable booleans rather than object columns.
+# amount stays float64 so money values and control thresholds are not rounded.
+OUTPUT_DTYPES = {
+    "account_age_days": "int32",
+    **{col: "Int32" for col in ("mcc", "bin", "wallet_age_days")},
+    **{col: "boolean" for col in ("card_present", "is_new_device", "to_is_high_risk")},
+}
+
+
+def generate_ach_transactions(
+    users: pd.DataFrame, n: int = 2000, rng: np.random.Generator = _RNG
+) -> pd.DataFrame:
     """
     Generate ACH-style transactions.
 
     Improvement:
     - Inject a small number of high-value instant ACH events for new accounts
       so the ACH control has something realistic to catch.
-    """
-    rows: List[Dict] = []
-
-    return_codes = [None, None, None, "R01", "R02", "R03", "R10", "R29"]  # more None = fewer returns
-
-    for i in range(n):
-        u = users.sample(1).iloc[0]
-
-        funding_speed = weighted_choice(["instant", "standard"], [0.25, 0.75])
-
-        # Base amount distribution
-        amount = round(abs(random.gauss(mu=250, sigma=400)), 2)
-        amount = max(5.0, min(amount, 12000.0))
-
-        # ✅ Improvement A: Inject some high-value instant ACH for new accounts
-        # This creates realistic “control-worthy” events without dominating the dataset.
-        if u["account_age_days"] < 30 and funding_speed == "instant" and random.random() < 0.08:
-            amount = round(random.uniform(5200, 12000), 2)
-
-        # Return code occurs sometimes; high-risk returns are rarer but present
-        return_code = random.choice(return_codes)
-
-        rows.append(
-            {
-                "tx_id": make_id("ach_tx", i),
-                "rail": "ACH",
-                "timestamp": rand_date_within_days(45),
-                "user_id": u["user_id"],
-                "device_id": u["device_id"],
-                "country": u["country"],
-
-                # Included for controls/monitoring
-                "account_age_days": int(u["account_age_days"]),
-
-                "amount": amount,
-                "currency": "USD",
-
-                # ACH fields
-                "funding_speed": funding_speed,
-                "return_code": return_code,
-
-                # Card fields
-                "card_present": None,
-                "mcc": None,
-                "bin": None,
-                "is_new_device": None,
-
-                # Crypto fields
-                "from_wallet_id": None,
-                "to_wallet_id": None,
-                "wallet_age_days": None,
-                "to_is_high_risk": None,
-            }
-        )
 
-    return pd.DataFrame(rows)
+    All n rows are drawn as NumPy arrays in one go (no per-row user sampling).
+    """
+    return_codes = np.array(
+        [None, None, None, "R01", "R02", "R03", "R10", "R29"], dtype=object
+    )  # more None = fewer returns
+
+    # Sample the sending user for every transaction at once
+    u = users.iloc[rng.integers(0, len(users), n)]
+    account_age_days = u["account_age_days"].to_numpy()
+
+    funding_speed = weighted_choices(FUNDING_OPTIONS, FUNDING_CUM, rng, n)
+
+    # Base amount distribution
+    amount = draw_amounts(rng, n, 250, 400, 5.0, 12000.0)
+
+    # ✅ Improvement A: Inject some high-value instant ACH for new accounts
+    # This creates realistic “control-worthy” events without dominating the dataset.
+    boost = (account_age_days < 30) & (funding_speed == "instant") & (rng.random(n) < 0.08)
+    amount[boost] = rng.uniform(5200, 12000, int(boost.sum())).round(2)
+
+    # Return code occurs sometimes; high-risk returns are rarer but present
+    return_code = return_codes[rng.integers(0, len(return_codes), n)]
+
+    return pd.DataFrame(
+        {
+            "tx_id": make_ids("ach_tx", np.arange(n)),
+            "rail": "ACH",
+            "timestamp": rand_dates_within_days(rng, n, 45),
+            "user_id": u["user_id"].to_numpy(),
+            "device_id": u["device_id"].to_numpy(),
+            "country": u["country"].to_numpy(),
+
+            # Included for controls/monitoring
+            "account_age_days": account_age_days.astype(int),
+
+            "amount": amount,
+            "currency": "USD",
+
+            # ACH fields
+            "funding_speed": funding_speed,
+            "return_code": return_code,
+        }
+    )
 
 
-def generate_card_transactions(users: pd.DataFrame, n: int = 2500) -> pd.DataFrame:
+def generate_card_transactions(
+    users: pd.DataFrame, n: int = 2500, rng: np.random.Generator = _RNG
+) -> pd.DataFrame:
     """
     Generate CARD-style transactions.
 
     Improvement:
     - Inject a small number of high-value online card transactions on new devices
       so the CARD REVIEW control fires more than a handful of times.
-    """
-    rows: List[Dict] = []
-
-    # Example MCCs: add some known riskier categories
-    mcc_options = [5411, 5812, 5999, 5732, 5967, 4829, 7995]
-    mcc_weights = [0.25, 0.25, 0.12, 0.15, 0.08, 0.08, 0.07]
-
-    # BINs: pretend these represent issuers; some bins appear more
-    bin_options = [400001, 400002, 510001, 510002, 378001]
-    bin_weights = [0.30, 0.15, 0.25, 0.20, 0.10]
-
-    for i in range(n):
-        u = users.sample(1).iloc[0]
-
-        card_present = random.random() < 0.15  # most are online (False)
-
-        # Base amount distribution
-        amount = round(abs(random.gauss(mu=60, sigma=120)), 2)
-        amount = max(1.0, min(amount, 3500.0))
-
-        mcc = random.choices(mcc_options, weights=mcc_weights, k=1)[0]
-        bin_num = random.choices(bin_options, weights=bin_weights, k=1)[0]
-
-        # is_new_device proxy
-        is_new_device = (u["account_age_days"] < 30) and (random.random() < 0.5)
-
-        # ✅ Improvement B: Inject some higher value online transactions on new devices
-        # This helps your REVIEW control appear in the dashboard more consistently.
-        if is_new_device and (card_present is False) and random.random() < 0.06:
-            amount = round(random.uniform(850, 2500), 2)
-
-        rows.append(
-            {
-                "tx_id": make_id("card_tx", i),
-                "rail": "CARD",
-                "timestamp": rand_date_within_days(45),
-                "user_id": u["user_id"],
-                "device_id": u["device_id"],
-                "country": u["country"],
-
-                "account_age_days": int(u["account_age_days"]),
-
-                "amount": amount,
-                "currency": "USD",
-
-                # ACH fields
-                "funding_speed": None,
-                "return_code": None,
-
-                # Card fields
-                "card_present": bool(card_present),
-                "mcc": int(mcc),
-                "bin": int(bin_num),
-                "is_new_device": bool(is_new_device),
-
-                # Crypto fields
-                "from_wallet_id": None,
-                "to_wallet_id": None,
-                "wallet_age_days": None,
-                "to_is_high_risk": None,
-            }
-        )
 
-    return pd.DataFrame(rows)
+    All n rows are drawn as NumPy arrays in one go (no per-row user sampling).
+    """
+    # Sample the card holder for every transaction at once
+    u = users.iloc[rng.integers(0, len(users), n)]
+    account_age_days = u["account_age_days"].to_numpy()
+
+    card_present = rng.random(n) < 0.15  # most are online (False)
+
+    # Base amount distribution
+    amount = draw_amounts(rng, n, 60, 120, 1.0, 3500.0)
+
+    mcc = weighted_choices(MCC_OPTIONS, MCC_CUM, rng, n)
+    bin_num = weighted_choices(BIN_OPTIONS, BIN_CUM, rng, n)
+
+    # is_new_device proxy
+    is_new_device = (account_age_days < 30) & (rng.random(n) < 0.5)
+
+    # ✅ Improvement B: Inject some higher value online transactions on new devices
+    # This helps your REVIEW control appear in the dashboard more consistently.
+    boost = is_new_device & ~card_present & (rng.random(n) < 0.06)
+    amount[boost] = rng.uniform(850, 2500, int(boost.sum())).round(2)
+
+    return pd.DataFrame(
+        {
+            "tx_id": make_ids("card_tx", np.arange(n)),
+            "rail": "CARD",
+            "timestamp": rand_dates_within_days(rng, n, 45),
+            "user_id": u["user_id"].to_numpy(),
+            "device_id": u["device_id"].to_numpy(),
+            "country": u["country"].to_numpy(),
+
+            "account_age_days": account_age_days.astype(int),
+
+            "amount": amount,
+            "currency": "USD",
+
+            # Card fields
+            "card_present": card_present,
+            "mcc": mcc.astype(int),
+            "bin": bin_num.astype(int),
+            "is_new_device": is_new_device,
+        }
+    )
 
 
-def generate_crypto_transactions(users: pd.DataFrame, wallets: pd.DataFrame, n: int = 1800) -> pd.DataFrame:
+def generate_crypto_transactions(
+    users: pd.DataFrame, wallets: pd.DataFrame, n: int = 1800, rng: np.random.Generator = _RNG
+) -> pd.DataFrame:
     """
     Generate CRYPTO-style transfers.
 
@@ -271,71 +340,66 @@ def generate_crypto_transactions(users: pd.DataFrame, wallets: pd.DataFrame, n:
     - from_wallet_id, to_wallet_id
     - wallet_age_days (age of FROM wallet)
     - to_is_high_risk (flag for known bad counterparty)
+
+    Senders and recipients are sampled as index arrays, and sender user details
+    come from one indexed lookup instead of a users scan per transfer.
     """
-    rows: List[Dict] = []
-
-    # Create a set of "high risk" destination wallets (synthetic)
-    high_risk_wallets = set(wallets.sample(int(len(wallets) * 0.03))["wallet_id"].tolist())
-
-    for i in range(n):
-        sender = wallets.sample(1).iloc[0]
-        sender_user = users[users["user_id"] == sender["user_id"]].iloc[0]
-
-        recipient = wallets.sample(1).iloc[0]
-
-        # Probability of sending to a high-risk wallet (small but present)
-        if random.random() < 0.04:
-            recipient_wallet_id = random.choice(list(high_risk_wallets))
-            to_is_high_risk = True
-        else:
-            recipient_wallet_id = recipient["wallet_id"]
-            to_is_high_risk = recipient_wallet_id in high_risk_wallets
-
-        # Amount in "crypto units"
-        amount = round(abs(random.gauss(mu=0.25, sigma=0.6)), 6)
-        amount = max(0.0005, min(amount, 25.0))
-
-        rows.append(
-            {
-                "tx_id": make_id("crypto_tx", i),
-                "rail": "CRYPTO",
-                "timestamp": rand_date_within_days(45),
-
-                "user_id": sender["user_id"],
-                "device_id": sender_user["device_id"],
-                "country": sender_user["country"],
-
-                "account_age_days": int(sender_user["account_age_days"]),
-
-                "amount": amount,
-                "currency": "CRYPTO",
-
-                # ACH fields
-                "funding_speed": None,
-                "return_code": None,
-
-                # Card fields
-                "card_present": None,
-                "mcc": None,
-                "bin": None,
-                "is_new_device": None,
-
-                # Crypto fields
-                "from_wallet_id": sender["wallet_id"],
-                "to_wallet_id": recipient_wallet_id,
-                "wallet_age_days": int(sender["wallet_age_days"]),
-                "to_is_high_risk": bool(to_is_high_risk),
-            }
-        )
+    wallet_ids = wallets["wallet_id"].to_numpy()
+
+    # Create a set of "high risk" destination wallets (synthetic), held as
+    # sorted wallet positions plus a per-wallet flag so membership is a lookup
+    high_risk_idx = np.sort(
+        rng.choice(len(wallets), size=int(len(wallets) * 0.03), replace=False)
+    )
+    is_high_risk_wallet = np.zeros(len(wallets), dtype=bool)
+    is_high_risk_wallet[high_risk_idx] = True
+
+    sender = wallets.iloc[rng.integers(0, len(wallets), n)]
+    sender_user = users.set_index("user_id").loc[sender["user_id"].to_numpy()]
+
+    recipient_idx = rng.integers(0, len(wallets), n)
+
+    # Probability of sending to a high-risk wallet (small but present)
+    forced = rng.random(n) < 0.04
+    if len(high_risk_idx):
+        recipient_idx[forced] = rng.choice(high_risk_idx, size=int(forced.sum()))
+    recipient_wallet_id = wallet_ids[recipient_idx]
+    to_is_high_risk = is_high_risk_wallet[recipient_idx]
+
+    # Amount in "crypto units"
+    amount = draw_amounts(rng, n, 0.25, 0.6, 0.0005, 25.0, decimals=6)
+
+    return pd.DataFrame(
+        {
+            "tx_id": make_ids("crypto_tx", np.arange(n)),
+            "rail": "CRYPTO",
+            "timestamp": rand_dates_within_days(rng, n, 45),
+
+            "user_id": sender["user_id"].to_numpy(),
+            "device_id": sender_user["device_id"].to_numpy(),
+            "country": sender_user["country"].to_numpy(),
 
-    return pd.DataFrame(rows)
+            "account_age_days": sender_user["account_age_days"].to_numpy().astype(int),
+
+            "amount": amount,
+            "currency": "CRYPTO",
+
+            # Crypto fields
+            "from_wallet_id": sender["wallet_id"].to_numpy(),
+            "to_wallet_id": recipient_wallet_id,
+            "wallet_age_days": sender["wallet_age_days"].to_numpy().astype(int),
+            "to_is_high_risk": to_is_high_risk,
+        }
+    )
 
 
 # -----------------------------
 # Pattern injection (optional but useful)
 # -----------------------------
 
-def inject_device_sharing(users: pd.DataFrame, share_rate: float = 0.08) -> pd.DataFrame:
+def inject_device_sharing(
+    users: pd.DataFrame, share_rate: float = 0.08, rng: np.random.Generator = _RNG
+) -> pd.DataFrame:
     """
     Introduce a simple "device sharing" effect: some users share device_id values.
     This mimics situations like account farms or synthetic identity clusters.
@@ -346,11 +410,11 @@ def inject_device_sharing(users: pd.DataFrame, share_rate: float = 0.08) -> pd.D
     if n_share <= 0:
         return users
 
-    shared_devices = [f"dev_{random.randint(1, 30):05d}" for _ in range(max(3, n_share // 10))]
+    shared_devices = make_ids("dev", rng.integers(1, 31, max(3, n_share // 10)), width=5)
 
-    idxs = users.sample(n_share).index
-    for idx in idxs:
-        users.loc[idx, "device_id"] = random.choice(shared_devices)
+    # Assign all sharing users a shared device in one vectorized write
+    idxs = users.sample(n_share, random_state=rng).index
+    users.loc[idxs, "device_id"] = rng.choice(shared_devices, size=n_share)
 
     return users
 
@@ -359,54 +423,113 @@ def inject_device_sharing(users: pd.DataFrame, share_rate: float = 0.08) -> pd.D
 # Main
 # -----------------------------
 
-def main() -> None:
-    ensure_data_dir()
-
-    users = generate_users(n_users=500)
-    users = inject_device_sharing(users, share_rate=0.10)
-    wallets = generate_wallets(users)
-
-    ach = generate_ach_transactions(users, n=2000)
-    card = generate_card_transactions(users, n=2500)
-    crypto = generate_crypto_transactions(users, wallets, n=1800)
-
-    combined = pd.concat([ach, card, crypto], ignore_index=True)
-
-    # Synthetic label to evaluate controls (proxy)
-    combined["is_fraud_pattern"] = False
-
-    ach_mask = (
-        (combined["rail"] == "ACH")
-        & (combined["funding_speed"] == "instant")
-        & (combined["amount"] > 5000)
-        & (combined["account_age_days"] < 30)
+def unified_categories(frames: Iterable[pd.DataFrame]) -> Dict[str, pd.CategoricalDtype]:
+    """Build one CategoricalDtype per CATEGORY_COLUMNS entry covering every rail's values."""
+    frames = list(frames)
+    return {
+        col: pd.CategoricalDtype(
+            sorted(set().union(*(frame[col].dropna().unique() for frame in frames if col in frame)))
+        )
+        for col in CATEGORY_COLUMNS
+    }
+
+
+def to_output_table(
+    frame: pd.DataFrame, category_dtypes: Dict[str, pd.CategoricalDtype]
+) -> pa.Table:
+    """Reindex one rail's frame to the unified columns and dtypes as an Arrow table."""
+    # Columns another rail owns come back as all-NaN floats. Casting with the
+    # explicit dtypes keeps them missing (never the string "nan"), and empty
+    # string columns go to object so Arrow types them as null, which the
+    # schema unification in main() promotes to the populated rails' type.
+    missing_strings = [col for col in STRING_COLUMNS if col not in frame]
+    frame = frame.reindex(columns=TX_COLUMNS + ["is_fraud_pattern"]).astype(
+        {**OUTPUT_DTYPES, **category_dtypes, **dict.fromkeys(missing_strings, object)}
     )
+    return pa.Table.from_pandas(frame, preserve_index=False)
 
-    card_mask = (
-        (combined["rail"] == "CARD")
-        & (combined["card_present"] == False)  # noqa: E712
-        & (combined["amount"] > 800)
-        & (combined["is_new_device"] == True)  # noqa: E712
-    )
 
-    crypto_mask = (
-        (combined["rail"] == "CRYPTO")
-        & (
-            (combined["to_is_high_risk"] == True)  # noqa: E712
-            | ((combined["wallet_age_days"] < 7) & (combined["amount"] > 2.0))
-        )
-    )
+# Rule per rail for the synthetic is_fraud_pattern label (mirrors controls.yaml)
+FRAUD_PATTERN_EXPRS = {
+    "ACH": "funding_speed == 'instant' & amount > 5000 & account_age_days < 30",
+    "CARD": "~card_present & amount > 800 & is_new_device",
+    "CRYPTO": "to_is_high_risk | (wallet_age_days < 7 & amount > 2.0)",
+}
 
-    combined.loc[ach_mask | card_mask | crypto_mask, "is_fraud_pattern"] = True
 
-    out_path = "data/combined_transactions.csv"
-    combined.to_csv(out_path, index=False)
+def main(write_csv: bool = False, workers: int = 1) -> None:
+    ensure_data_dir()
+
+    # Entities and each rail draw from their own child stream of _RNG, so
+    # changing one rail's n does not shift the values the others see, and the
+    # output does not depend on whether the rails run in worker processes.
+    entity_rng, ach_rng, card_rng, crypto_rng = _RNG.spawn(4)
+
+    users = generate_users(n_users=500, rng=entity_rng)
+    users = inject_device_sharing(users, share_rate=0.10, rng=entity_rng)
+    wallets = generate_wallets(users, rng=entity_rng)
+
+    jobs = {
+        "ACH": partial(generate_ach_transactions, users, n=2000, rng=ach_rng),
+        "CARD": partial(generate_card_transactions, users, n=2500, rng=card_rng),
+        "CRYPTO": partial(generate_crypto_transactions, users, wallets, n=1800, rng=crypto_rng),
+    }
+
+    # The rails are independent. At the default sizes each takes milliseconds,
+    # less than starting a worker process, so parallelism is opt-in for large n.
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            futures = {rail: pool.submit(job) for rail, job in jobs.items()}
+            by_rail = {rail: future.result() for rail, future in futures.items()}
+    else:
+        by_rail = {rail: job() for rail, job in jobs.items()}
+
+    # Synthetic label to evaluate controls (proxy). Each rail's rule is a single
+    # eval() over that rail's own plain numpy columns, so numexpr (from
+    # requirements.txt) fuses the comparisons and no rail == X filter pass is needed.
+    for rail, frame in by_rail.items():
+        frame["is_fraud_pattern"] = frame.eval(FRAUD_PATTERN_EXPRS[rail]).astype(bool)
+
+    # Each rail becomes its own Arrow table in the unified schema (other rails'
+    # fields empty) and is written as its own row group, so there is no pandas
+    # concat copy and readers filtering on rail can skip whole row groups.
+    category_dtypes = unified_categories(by_rail.values())
+    tables = [to_output_table(frame, category_dtypes) for frame in by_rail.values()]
+    schema = pa.unify_schemas([t.schema for t in tables], promote_options="permissive")
+    tables = [t.cast(schema) for t in tables]
+
+    n_rows = sum(t.num_rows for t in tables)
+    out_path = DATA_DIR / "combined_transactions.parquet"
+    with atomic_path(out_path) as tmp:
+        with pq.ParquetWriter(tmp, schema, compression="zstd") as writer:
+            for table in tables:
+                writer.write_table(table)
+    print(f"✅ Wrote {n_rows:,} rows to {out_path}")
+
+    if write_csv:
+        csv_path = DATA_DIR / "combined_transactions.csv"
+        with atomic_path(csv_path) as tmp:
+            pa.concat_tables(tables).to_pandas().to_csv(tmp, index=False)
+        print(f"✅ Wrote {n_rows:,} rows to {csv_path}")
 
-    print(f"✅ Wrote {len(combined):,} rows to {out_path}")
     print("Rails breakdown:")
-    print(combined["rail"].value_counts().to_string())
+    for rail, frame in by_rail.items():
+        print(f"{rail:<8}{len(frame):>6}")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Generate synthetic multi-rail transactions.")
+    parser.add_argument(
+        "--csv",
+        action="store_true",
+        help="also write data/combined_transactions.csv",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="generate the three rails in up to this many worker processes",
+    )
+    args = parser.parse_args()
+    main(write_csv=args.csv, workers=args.workers)
 